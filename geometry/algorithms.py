@@ -1,6 +1,7 @@
-from math import pi, atan
-from typing import List, Set, Tuple
-from geometry.plane import Point, Segment, Ray, Triangle, Line, Circle
+from math import pi, atan2, cos, inf, sin
+from random import randrange
+from typing import Iterable, List, Set, Tuple
+from geometry.plane import Point, Segment, Ray, Triangle, circumcircle, incircle
 
 
 def convex_hull(points: Set[Point]) -> List[Point]:
@@ -9,84 +10,362 @@ def convex_hull(points: Set[Point]) -> List[Point]:
     This function implements the Quickhull algorithm.
     Reference: https://en.wikipedia.org/wiki/Quickhull#Algorithm.
     """
-    n, hull, points_as_list = len(points), [], list(points)
-    if len(points) <= 3:
-        return points_as_list
-    
-    def find_hull(_points: Set[Point], p1: Point, p2: Point) -> None:
-        if not _points:
-            return
-        # Construct a triangle with the furthest point as the third vertex.
-        main_line = Line.from_two_points(p1, p2)
-        furthest_point = max(_points, key=lambda p: main_line.distance_to(p))
-        triangle = Triangle(p1, furthest_point, p2)
-        # Remove triangle and points strictly inside of it.
-        _points = {p for p in _points if not triangle.strictly_contains(p)} - {furthest_point}
-        # Now we only need to consider one of p1-fp or p2-fp to create the partition.
-        line_p1fp = Line.from_two_points(p1, furthest_point)
-        s1, s2 = set(), set()
-        if main_line.is_strictly_below(furthest_point):
-            for p in _points:
-                (s1 if line_p1fp.is_strictly_below(p) or line_p1fp.contains(p) else s2).add(p)
-        else:
-            for p in _points:
-                (s1 if not line_p1fp.is_strictly_below(p) else s2).add(p)
-        find_hull(s1, p1, furthest_point)
-        hull.append(furthest_point)
-        find_hull(s2, furthest_point, p2)
-        
+    points_as_list = list(points)
+    return [points_as_list[i] for i in convex_hull_indices(
+        [p.x for p in points_as_list], [p.y for p in points_as_list])]
+
+
+def convex_hull_indices(xs: List[float], ys: List[float]) -> List[int]:
+    """Compute the convex hull of the points with the given coordinates.
+
+    Same as convex_hull, but the points are given as two parallel lists of coordinates and the hull
+    as the indices of its vertices. The subproblems work on indices as well, and every half-plane
+    test is a cross product, so no intermediate objects or divisions are needed.
+    """
+    n = len(xs)
+    if n <= 3:
+        return list(range(n))
+    # Most of the points are discarded in linear time, and the survivors keep their order, so the
+    # same hull is found among them.
+    candidates = akl_toussaint_indices(xs, ys)
+    if len(candidates) < n:
+        return [candidates[i] for i in _quickhull(
+            [xs[i] for i in candidates], [ys[i] for i in candidates])]
+    return _quickhull(xs, ys)
+
+
+def _quickhull(xs: List[float], ys: List[float]) -> List[int]:
+    """Compute the convex hull of at least four points with the given coordinates; see above."""
     # Find leftmost and rightmost points.
-    min_x, max_x = points_as_list[0], points_as_list[n - 1]
-    for i in range(n - 1):
-        min_x = points_as_list[i + 1] if points_as_list[i + 1].x < min_x.x else min_x
-        max_x = points_as_list[n - 2 - i] if points_as_list[n - 2 - i].x > max_x.x else max_x
-    # First line that partitions the set (in two).
-    line = Line.from_two_points(min_x, max_x)
-    hull.append(min_x)
-    find_hull({p for p in points if line.is_strictly_below(p)}, min_x, max_x)
-    hull.append(max_x)
-    find_hull({p for p in points if not line.is_strictly_below(p)} - {min_x, max_x}, max_x, min_x)
+    min_x, max_x = xs.index(min(xs)), xs.index(max(xs))
+    if min_x == max_x:  # All the points are on a vertical line.
+        min_x, max_x = ys.index(min(ys)), ys.index(max(ys))
+    # First line that partitions the set (in two); the side of every point is used for both halves.
+    x1, y1, dx, dy = xs[min_x], ys[min_x], xs[max_x] - xs[min_x], ys[max_x] - ys[min_x]
+    sides = [dx * (y - y1) - dy * (x - x1) for x, y in zip(xs, ys)]
+    # Instead of recursing, pending subproblems are kept on a stack. Each one is a list of indices
+    # of points strictly to the left of the line from i1 to i2, which are consecutive vertices of
+    # the hull found so far; the hull itself is kept as a map from each vertex to the next one.
+    following = {min_x: max_x, max_x: min_x}
+    stack = [([i for i, side in enumerate(sides) if side > 0], min_x, max_x),
+             ([i for i, side in enumerate(sides) if side < 0], max_x, min_x)]
+    while stack:
+        indices, i1, i2 = stack.pop()
+        if len(indices) <= 1:
+            # A single point is necessarily a vertex, and there is nothing left to partition.
+            if indices:
+                following[i1], following[indices[0]] = indices[0], i2
+            continue
+        x1, y1, dx, dy = xs[i1], ys[i1], xs[i2] - xs[i1], ys[i2] - ys[i1]
+        # The cross product is proportional to the distance to the line; the furthest point is a
+        # vertex of the hull.
+        distances = [dx * (ys[i] - y1) - dy * (xs[i] - x1) for i in indices]
+        furthest = indices[distances.index(max(distances))]
+        following[i1], following[furthest] = furthest, i2
+        # Points on or inside the triangle i1, furthest, i2 (including furthest) are discarded.
+        xf, yf = xs[furthest], ys[furthest]
+        dx1, dy1, dx2, dy2 = xf - x1, yf - y1, xs[i2] - xf, ys[i2] - yf
+        stack.append(([i for i in indices if dx1 * (ys[i] - y1) - dy1 * (xs[i] - x1) > 0],
+                      i1, furthest))
+        stack.append(([i for i in indices if dx2 * (ys[i] - yf) - dy2 * (xs[i] - xf) > 0],
+                      furthest, i2))
+    hull, i = [min_x], following[min_x]
+    while i != min_x:
+        hull.append(i)
+        i = following[i]
     return hull
 
 
+def akl_toussaint_indices(xs: List[float], ys: List[float]) -> List[int]:
+    """Discard the points that cannot be vertices of the convex hull of the given points.
+
+    Returns the indices, in ascending order, of the points that are not strictly inside the octagon
+    whose vertices are the extreme points in the directions of x, y, x + y and x - y.
+    Reference: S. G. Akl and G. T. Toussaint, A fast convex hull algorithm (1978).
+    """
+    n = len(xs)
+    if n <= 8:
+        return list(range(n))
+    sums, differences = [x + y for x, y in zip(xs, ys)], [x - y for x, y in zip(xs, ys)]
+    # Around the octagon counterclockwise, starting at the leftmost point.
+    octagon = [values.index(extreme(values)) for values, extreme in (
+        (xs, min), (sums, min), (ys, min), (differences, max),
+        (xs, max), (sums, max), (ys, max), (differences, min))]
+    edges = [(xs[i1], ys[i1], xs[i2] - xs[i1], ys[i2] - ys[i1])
+             for i1, i2 in zip(octagon, octagon[1:] + octagon[:1])
+             if xs[i1] != xs[i2] or ys[i1] != ys[i2]]
+    if len(edges) < 3:  # All the points are on a line, so none of them is strictly inside.
+        return list(range(n))
+    # Most of the octagon is covered by a rectangle between its vertices, and testing whether a
+    # point is inside of it takes comparisons instead of eight cross products. The rectangle is
+    # only used if its corners are on or inside the octagon, so that it is contained in it.
+    left, bottom_left, bottom, bottom_right, right, top_right, top, top_left = octagon
+    x_min = max(xs[left], xs[bottom_left], xs[top_left])
+    x_max = min(xs[right], xs[bottom_right], xs[top_right])
+    y_min = max(ys[bottom], ys[bottom_left], ys[bottom_right])
+    y_max = min(ys[top], ys[top_left], ys[top_right])
+    candidates = range(n)
+    if all(dx * (y - y1) - dy * (x - x1) >= 0 for x1, y1, dx, dy in edges
+           for x, y in ((x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max))):
+        candidates = [i for i, x, y in zip(candidates, xs, ys)
+                      if not (x_min < x < x_max and y_min < y < y_max)]
+    # A point strictly inside is strictly to the left of every edge, so each edge only has to test
+    # the points that passed the previous ones. Edges between repeated vertices were left out.
+    inside = candidates
+    for x1, y1, dx, dy in edges:
+        inside = [i for i in inside if dx * (ys[i] - y1) - dy * (xs[i] - x1) > 0]
+    inside = set(inside)
+    return [i for i in candidates if i not in inside]
+
+
+def convex_hull_insert(hull: List[int], xs: List[float], ys: List[float],
+                       i: int) -> Tuple[int, int, List[int], int]:
+    """Update, in place, the convex hull of the first i points so that it includes the i-th one.
+
+    The hull is given as the indices of its vertices in clockwise order, as returned by
+    convex_hull_monotone_indices, although it may start at any vertex. Only the vertices the new
+    point can see are replaced, so an insertion takes time proportional to the size of the hull
+    instead of the number of points. Returns the change, which convex_hull_undo can revert.
+    """
+    h, px, py = len(hull), xs[i], ys[i]
+    if h == 3:
+        a, b, c = hull
+        degenerate = (xs[b] - xs[a]) * (ys[c] - ys[a]) - (ys[b] - ys[a]) * (xs[c] - xs[a]) >= 0
+    else:
+        degenerate = h < 3
+    if not degenerate:
+        # The new point can see the edges that have it strictly on their left.
+        crosses = [(xs[b] - xs[a]) * (py - ys[a]) - (ys[b] - ys[a]) * (px - xs[a])
+                   for a, b in zip(hull, hull[1:] + hull[:1])]
+        if all(cross <= 0 for cross in crosses):
+            return 0, 0, [], 0
+        # The visible edges are consecutive, from the s-th to the t-th; the vertices between them
+        # are replaced by the new point. So is a vertex that would be left between the new point
+        # and its neighbor on a line.
+        s = next(m for m in range(h) if crosses[m] > 0 and crosses[m - 1] <= 0)
+        t = s
+        while crosses[(t + 1) % h] > 0:
+            t += 1
+        if crosses[s - 1] == 0:
+            s -= 1
+        if crosses[(t + 1) % h] == 0:
+            t += 1
+        if h - (t - s) >= 2:
+            # The hull is rotated so that the replaced vertices start right after the first one.
+            rotation = s % h
+            hull[:] = hull[rotation:] + hull[:rotation]
+            replaced = hull[1:t - s + 1]
+            hull[1:t - s + 1] = [i]
+            return rotation, 1, replaced, 1
+    # There are too few points for a polygon, or they're all on a line, so the hull is computed
+    # again. The monotone chain needs no trigonometry or recursion, and its hulls are always
+    # clockwise and without collinear vertices.
+    replaced = hull[:]
+    hull[:] = convex_hull_monotone_indices(xs[:i + 1], ys[:i + 1])
+    return 0, 0, replaced, len(hull)
+
+
+def convex_hull_undo(hull: List[int], change: Tuple[int, int, List[int], int]):
+    """Revert, in place, the latest change that convex_hull_insert made to a hull."""
+    rotation, position, replaced, length = change
+    hull[position:position + length] = replaced
+    if rotation:
+        hull[:] = hull[-rotation:] + hull[:-rotation]
+
+
+def convex_hull_monotone(points: Set[Point]) -> List[Point]:
+    """Compute the convex hull of a set of points in a two-dimensional space.
+
+    This function implements Andrew's monotone chain algorithm, which needs no recursion: after
+    sorting, each chain is built in a single pass with one cross product per step. The vertices are
+    in the same order as in convex_hull (clockwise, starting at the leftmost point).
+    Reference:
+    https://en.wikibooks.org/wiki/Algorithm_Implementation/Geometry/Convex_hull/Monotone_chain.
+    """
+    points_as_list = list(points)
+    return [points_as_list[i] for i in convex_hull_monotone_indices(
+        [p.x for p in points_as_list], [p.y for p in points_as_list])]
+
+
+def convex_hull_monotone_indices(xs: List[float], ys: List[float]) -> List[int]:
+    """Compute the convex hull of the points with the given coordinates.
+
+    Same as convex_hull_monotone, but the points are given as two parallel lists of coordinates and
+    the hull as the indices of its vertices, which are sorted by their (x, y) pairs. Unlike
+    convex_hull_indices, the hull never has collinear vertices.
+    """
+    order = sorted(range(len(xs)), key=list(zip(xs, ys)).__getitem__)
+    n = len(order)
+    if n <= 2:
+        return order
+
+    def chain(indices: List[int]) -> List[int]:
+        stack = []
+        for i in indices:
+            x, y = xs[i], ys[i]
+            # Discard the last vertex while it does not make a clockwise (right) turn.
+            while len(stack) >= 2:
+                o, a = stack[-2], stack[-1]
+                if (xs[a] - xs[o]) * (y - ys[o]) - (ys[a] - ys[o]) * (x - xs[o]) < 0:
+                    break
+                stack.pop()
+            stack.append(i)
+        return stack
+
+    # The last vertex of each chain is the first one of the other.
+    upper, lower = chain(order), chain(order[::-1])
+    return upper[:-1] + lower[:-1]
+
+
 def delaunay_triangulation(points: Set[Point]) -> Set[Triangle]:
     """Compute the Delaunay triangulation of a set of points in a two-dimensional space.
     
     This function implements the Bowyer-Watson algorithm.
     Reference: https://en.wikipedia.org/wiki/Bowyer-Watson_algorithm.
     """
-    if len(points) <= 2:
-        return set()
-    min_x, max_x = min(points, key=lambda p: p.x), max(points, key=lambda p: p.x)
-    min_y, max_y = min(points, key=lambda p: p.y), max(points, key=lambda p: p.y)
-    super_triangle_line1 = Line.from_two_points(
-        Point(min_x.x - 1, min_y.y - 1), Point(min_x.x, max_y.y + 1))
-    super_triangle_line2 = Line.from_two_points(
-        Point(max_x.x + 1, min_y.y - 1), Point(max_x.x, max_y.y + 1))
-    super_triangle = Triangle(
-        Point(min_x.x - 1, min_y.y - 1),
-        Point(max_x.x + 1, min_y.y - 1),
-        super_triangle_line1.intersection(super_triangle_line2))
-    triangulation = {super_triangle}
-    for p in points:
-        bad_triangles = {
-            triangle for triangle in triangulation
-            if Circle.from_triangle(triangle).strictly_contains(p)}
-        polygon = set()
-        for triangle in bad_triangles:
-            edges = [Segment(triangle.p1, triangle.p2), Segment(triangle.p2, triangle.p3),
-                     Segment(triangle.p3, triangle.p1)]
-            for edge in edges:
-                # Use the fact that an edge can only be part of at most two triangles.
-                if edge in polygon:
-                    polygon.remove(edge)
-                else:
-                    polygon.add(edge)
-        triangulation -= bad_triangles
-        triangulation |= {Triangle(edge.p1, edge.p2, p) for edge in polygon}
-    triangulation -= {
-        triangle for triangle in triangulation if triangle.shares_vertex(super_triangle)}
-    return triangulation
+    points_as_list = list(points)
+    xs, ys = [p.x for p in points_as_list], [p.y for p in points_as_list]
+    return {Triangle(points_as_list[i], points_as_list[j], points_as_list[k])
+            for i, j, k in delaunay_triangulation_indices(xs, ys)}
+
+
+def delaunay_triangulation_indices(
+        xs: List[float], ys: List[float]) -> List[Tuple[int, int, int]]:
+    """Compute the Delaunay triangulation of the points with the given coordinates.
+
+    Same as delaunay_triangulation, but the points are given as two parallel lists of coordinates
+    and each triangle as the indices of its vertices, in counterclockwise order.
+    """
+    # Repeated points would yield empty triangles, so only one index is kept for each point.
+    unique = list({point: i for i, point in enumerate(zip(xs, ys))}.values())
+    if len(unique) <= 2:
+        return []
+    triangles = _bowyer_watson([xs[i] for i in unique], [ys[i] for i in unique])
+    return [(unique[i], unique[j], unique[k]) for i, j, k in triangles]
+
+
+def _bowyer_watson(xs: List[float], ys: List[float]) -> List[Tuple[int, int, int]]:
+    """Triangulate the points with the given coordinates, which are extended in place.
+
+    Each triangle is represented by the indices of its vertices in counterclockwise order. The
+    super triangle's vertices are appended to both lists, and any triangle that uses them is left
+    out of the result.
+    """
+    n = len(xs)
+    # A super triangle that is too small cuts circumcircles of the actual triangulation and loses
+    # thin triangles on the convex hull. The base is at a distance d from the points' bounding box
+    # and the apex at twice the base's width above it. Its vertices are integers whenever the
+    # points are (the base is widened by one if needed), so with integer input every determinant is
+    # computed exactly no matter how large it is, and d can exceed the circumradius of any triangle
+    # with integer vertices in the box: for a box of side s, that's at most (s * 2^0.5)^3 / 2, since
+    # the area of such a triangle is at least 1/2. With floats, such a large triangle would ruin the
+    # precision of the determinants, so it's only a thousand times the size of the box, and
+    # extremely thin triangles on the hull may still be lost.
+    min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+    side = max(max_x - min_x, max_y - min_y) + 1
+    if all(isinstance(v, int) for v in xs) and all(isinstance(v, int) for v in ys):
+        d = 4 * side ** 3
+    else:
+        d = 1000 * side
+    left, right, bottom = min_x - d, max_x + d, min_y - d
+    right += (right - left) % 2
+    width = right - left
+    xs += [left, right, left + width // 2]
+    ys += [bottom, bottom, bottom + 2 * width]
+    # Every triangle is kept counterclockwise, which fixes the sign of the in-circle determinant.
+    # Triangles are identified by their position in these lists; neighbors[t][i] is the triangle
+    # across the edge opposite to the i-th vertex of t (or -1), and removed triangles stay in place.
+    vertices, neighbors, alive = [(n, n + 1, n + 2)], [[-1, -1, -1]], [True]
+    # Consecutive points along a Hilbert curve are close to each other, so the walk to the triangle
+    # that contains each point is short.
+    for p in _hilbert_order(xs[:n], ys[:n]):
+        px, py = xs[p], ys[p]
+        # Walk from the newest triangle towards p, crossing any edge that has p strictly on its
+        # right, until reaching a triangle that contains it; that one is always bad. The edges are
+        # tested starting at a random one: always testing them in the same order can cycle forever
+        # when rounding errors leave the triangulation not quite Delaunay, while this stochastic
+        # walk terminates with probability one in any triangulation.
+        # Reference: O. Devillers, S. Pion and M. Teillaud, Walking in a triangulation (2002).
+        seed, moved = len(vertices) - 1, True
+        while moved:
+            moved = False
+            a, b, c = vertices[seed]
+            edges = ((b, c, neighbors[seed][0]), (c, a, neighbors[seed][1]),
+                     (a, b, neighbors[seed][2]))
+            first = randrange(3)
+            for edge_start, edge_end, u in edges[first:] + edges[:first]:
+                # Both triangles that share an edge must agree on the side p is on, but the
+                # rounded cross product isn't exactly antisymmetric, so it's always computed from
+                # the endpoint with the smaller index.
+                i1, i2 = min(edge_start, edge_end), max(edge_start, edge_end)
+                x1, y1 = xs[i1], ys[i1]
+                cross = (xs[i2] - x1) * (py - y1) - (ys[i2] - y1) * (px - x1)
+                if cross < 0 if i1 == edge_start else cross > 0:
+                    seed, moved = u, True
+                    break
+        # The bad triangles form a connected region around p, so instead of testing every
+        # triangle, the search spreads from the seed to the neighbors of each bad triangle. The
+        # edges between a bad and a good triangle (or none) form the polygonal hole, and they go
+        # counterclockwise around it in their bad triangles (as do the new triangles).
+        bad_triangles, good_triangles, polygon, pending = {seed}, set(), [], [seed]
+        while pending:
+            t = pending.pop()
+            a, b, c = vertices[t]
+            for edge_start, edge_end, u in ((b, c, neighbors[t][0]), (c, a, neighbors[t][1]),
+                                            (a, b, neighbors[t][2])):
+                if u in bad_triangles:
+                    continue
+                if u != -1 and u not in good_triangles:
+                    i, j, k = vertices[u]
+                    if incircle(xs[i], ys[i], xs[j], ys[j], xs[k], ys[k], px, py) > 0:
+                        bad_triangles.add(u)
+                        pending.append(u)
+                        continue
+                    good_triangles.add(u)
+                polygon.append((edge_start, edge_end, u, t))
+        for t in bad_triangles:
+            alive[t] = False
+        # Connect every edge of the hole to p. Around p, the new triangle that starts at a vertex
+        # is followed by the one that ends at it.
+        starting_at, ending_at = {}, {}
+        for edge_start, edge_end, u, t in polygon:
+            new = len(vertices)
+            vertices.append((edge_start, edge_end, p))
+            neighbors.append([-1, -1, u])
+            alive.append(True)
+            starting_at[edge_start], ending_at[edge_end] = new, new
+            if u != -1:
+                neighbors[u][neighbors[u].index(t)] = new
+        for edge_start, edge_end, _, _ in polygon:
+            new = starting_at[edge_start]
+            neighbors[new][0], neighbors[new][1] = starting_at[edge_end], ending_at[edge_start]
+    return [vertices[t] for t in range(len(vertices)) if alive[t] and max(vertices[t]) < n]
+
+
+def _hilbert_order(xs: List[float], ys: List[float]) -> List[int]:
+    """Sort the indices of the given points by their position along a Hilbert curve.
+
+    The points are first mapped onto a 1024 x 1024 grid that covers their bounding box.
+    Reference: https://en.wikipedia.org/wiki/Hilbert_curve#Applications_and_mapping_algorithms.
+    """
+    side = 1024
+    min_x, min_y = min(xs), min(ys)
+    scale = (side - 1) / (max(max(xs) - min_x, max(ys) - min_y) or 1)
+
+    def distance(i: int) -> int:
+        x, y, d, s = int((xs[i] - min_x) * scale), int((ys[i] - min_y) * scale), 0, side // 2
+        while s > 0:
+            rx, ry = 1 if x & s else 0, 1 if y & s else 0
+            d += s * s * ((3 * rx) ^ ry)
+            # Rotate the quadrant so that the curve inside it has the standard orientation.
+            if ry == 0:
+                if rx == 1:
+                    x, y = side - 1 - x, side - 1 - y
+                x, y = y, x
+            s //= 2
+        return d
+
+    return sorted(range(len(xs)), key=distance)
 
 
 def voronoi_diagram(points: Set[Point]) -> Tuple[Set[Segment], Set[Ray]]:
@@ -98,39 +377,62 @@ def voronoi_diagram(points: Set[Point]) -> Tuple[Set[Segment], Set[Ray]]:
       - If there are three or more collinear points, there is possibly no triangulation.
       - If there are four or more cocircular points, the triangulation is ambiguous.
     """
-    if len(points) <= 2:
+    points_as_list = list(dict.fromkeys(points))
+    if len(points_as_list) <= 2:
         return set(), set()
-    triangles = delaunay_triangulation(points)
-    circumcenters1, circumcenters2, edge_below_point = {}, {}, {}
-    for triangle in triangles:
-        p1, p2, p3 = triangle.p1, triangle.p2, triangle.p3
-        circumcircle = Circle.from_triangle(triangle)
-        circumcenter = Point(circumcircle.h, circumcircle.k)
-        edges = [Segment(p1, p2), Segment(p2, p3), Segment(p3, p1)]
-        edge_below_point.update({
-            edges[0]: Line.from_two_points(p1, p2).is_strictly_below(p3),
-            edges[1]: Line.from_two_points(p2, p3).is_strictly_below(p1),
-            edges[2]: Line.from_two_points(p3, p1).is_strictly_below(p2)})
-        for edge in edges:
+    xs, ys = [p.x for p in points_as_list], [p.y for p in points_as_list]
+    circumcenters1, circumcenters2, opposite_vertex = {}, {}, {}
+    for i, j, k in _bowyer_watson(xs, ys):
+        circumcenter = Point(*circumcircle(xs[i], ys[i], xs[j], ys[j], xs[k], ys[k])[:2])
+        for edge, vertex in ((_edge_key(i, j), k), (_edge_key(j, k), i), (_edge_key(k, i), j)):
             try:
                 _ = circumcenters1[edge]
                 circumcenters2[edge] = circumcenter
             except KeyError:
                 circumcenters1[edge] = circumcenter
+                opposite_vertex[edge] = vertex
     segments, rays = set(), set()
     for edge, point in circumcenters1.items():
         try:
             other_point = circumcenters2[edge]
             segments.add(Segment(point, other_point))
         except KeyError:
-            midpoint = edge.p1.midpoint(edge.p2)
-            line = Line.from_two_points(edge.p1, edge.p2).orthogonal_line(midpoint)
-            if line.a == 0:
-                angle = pi if edge_below_point[edge] else 0
-            elif line.b == 0:
-                angle = 3 * pi / 2 if edge_below_point[edge] else pi / 2
-            else:
-                angle = atan(line.slope) if line.slope >= 0 else pi - abs(atan(line.slope))
-                angle = pi + angle if edge_below_point[edge] else angle
+            # Only the edges on the convex hull get here, and each of them only once, so the side
+            # of the edge on which the triangle lies is computed here instead of for every edge.
+            i, j, k = edge >> 32, edge & 0xFFFFFFFF, opposite_vertex[edge]
+            dx, dy = xs[j] - xs[i], ys[j] - ys[i]
+            cross = dx * (ys[k] - ys[i]) - dy * (xs[k] - xs[i])
+            edge_below_point = cross * dx > 0 if dx != 0 else xs[k] > xs[i]
+            # The ray is perpendicular to the edge, so its direction is (-dy, dx) or (dy, -dx),
+            # whichever points away from the triangle. This is the angle the orthogonal Line would
+            # give, without building any Line objects.
+            angle = atan2(dx, -dy) % pi
+            angle = pi + angle if edge_below_point else angle
             rays.add(Ray(point, angle))
     return segments, rays
+
+
+def ray_endpoints(rays: Iterable[Ray], width: float, height: float) -> List[Tuple[float, float]]:
+    """Compute the point where each ray reaches the border of [0, width] x [0, height].
+
+    Along the unit vector (cos, sin) of a ray's angle, the distance to each border takes a single
+    division, and the nearest of the two borders the ray points toward is the one it reaches; no
+    lines or intersections are built.
+    """
+    endpoints = []
+    for ray in rays:
+        x, y, angle = ray.p.x, ray.p.y, ray.angle
+        cos_a, sin_a = cos(angle), sin(angle)
+        t1 = ((height if sin_a > 0 else 0) - y) / sin_a if sin_a != 0 else inf
+        t2 = ((width if cos_a > 0 else 0) - x) / cos_a if cos_a != 0 else inf
+        t = t1 if abs(t1) < abs(t2) else t2
+        endpoints.append((x + t * cos_a, y + t * sin_a))
+    return endpoints
+
+
+def _edge_key(i: int, j: int) -> int:
+    """Pack the indices of an edge's endpoints into a single integer, regardless of their order.
+
+    The smaller index goes in the upper 32 bits, so an integer hash replaces hashing two points.
+    """
+    return i << 32 | j if i < j else j << 32 | i
@@ -1,5 +1,5 @@
-from math import pi, tan
-from typing import Optional
+from math import hypot, pi, tan
+from typing import Optional, Tuple
 
 
 class Point:
@@ -10,6 +10,8 @@ class Point:
         y: The ordinate.
     """
     
+    __slots__ = ('x', 'y', '_h')
+    
     def __init__(self, x: float, y: float):
         """Create a point with the given coordinates."""
         self.x = x
@@ -25,11 +27,15 @@ class Point:
     
     def __eq__(self, other):
         """Determine if the two points represent the same element in the Euclidean space."""
-        return isinstance(other, type(self)) and (self.x, self.y) == (other.x, other.y)
+        return isinstance(other, type(self)) and self.x == other.x and self.y == other.y
     
     def __hash__(self):
-        """Hash the coordinates and their respective order."""
-        return hash(self.x) ^ hash(self.y) ^ hash((self.x, self.y))
+        """Hash the coordinates and their respective order; the hash is computed only once."""
+        try:
+            return self._h
+        except AttributeError:
+            self._h = hash((self.x, self.y))
+            return self._h
     
     def distance_to(self, other) -> float:
         """Compute the distance from this point to another."""
@@ -43,22 +49,28 @@ class Point:
 class Segment:
     """Represents a straight line with extremes on two distinct points.
     
+    The points are stored in lexicographic order, so segments PQ and QP are indistinguishable.
+    
     Attributes:
-        p1: The first point.
-        p2: The second point."""
+        p1: The point with the lesser abscissa (or ordinate, if the abscissas are equal).
+        p2: The other point."""
+    
+    __slots__ = ('p1', 'p2')
     
     def __init__(self, p1: Point, p2: Point):
         """Create a segment between the two given points."""
+        if (p1.x, p1.y) > (p2.x, p2.y):
+            p1, p2 = p2, p1
         self.p1 = p1
         self.p2 = p2
         
     def __eq__(self, other):
         """Determine if this segment has the same two points as another (in any order)."""
-        return (isinstance(other, type(self))) and not {self.p1, self.p2} - {other.p1, other.p2}
+        return isinstance(other, type(self)) and self.p1 == other.p1 and self.p2 == other.p2
     
     def __hash__(self):
         """Hash the two points; a segment PQ will return the same hash as QP."""
-        return hash(self.p1) ^ hash(self.p2)
+        return hash((self.p1, self.p2))
     
     def __str__(self):
         """Return P-Q."""
@@ -74,6 +86,8 @@ class Ray:
                and the x-axis.
     """
     
+    __slots__ = ('p', 'angle')
+    
     def __init__(self, p: Point, angle: float):
         """Create a ray with the given parameters."""
         self.p = p
@@ -89,7 +103,7 @@ class Ray:
 
     def __hash__(self):
         """Hash the endpoint and angle in that order."""
-        return hash(self.p) ^ hash(self.angle) ^ hash((self.p, self.angle))
+        return hash((self.p, self.angle))
         
     def angle_in_degrees(self) -> float:
         """Return this ray's angle in degrees."""
@@ -97,27 +111,56 @@ class Ray:
     
 
 class Triangle:
-    """Represents the polygon formed by three distinct points on plane."""
+    """Represents the polygon formed by three distinct points on plane.
+    
+    The points are stored in lexicographic order, so any order of PQR gives the same triangle.
+    """
+    
+    __slots__ = ('p1', 'p2', 'p3', '_h', '_circumcircle', '_signed_area')
     
     def __init__(self, p1: Point, p2: Point, p3: Point):
         """Create a triangle with the given points."""
-        self.p1 = p1
-        self.p2 = p2
-        self.p3 = p3
+        self.p1, self.p2, self.p3 = sorted((p1, p2, p3), key=lambda p: (p.x, p.y))
 
     def __eq__(self, other):
         """Determine if this triangle has the same three points as another (in any order)."""
-        return (isinstance(other, type(self))) and not (
-            {self.p1, self.p2, self.p3} - {other.p1, other.p2, other.p3})
+        return isinstance(other, type(self)) and (self.p1, self.p2, self.p3) == (
+            other.p1, other.p2, other.p3)
 
     def __hash__(self):
-        """Hash the three points; triangles with any order of PQR will return the same hash."""
-        return hash(self.p1) ^ hash(self.p2) ^ hash(self.p3)
+        """Hash the three points; triangles with any order of PQR will return the same hash.
+
+        The hash is computed only once.
+        """
+        try:
+            return self._h
+        except AttributeError:
+            self._h = hash((self.p1, self.p2, self.p3))
+            return self._h
     
     def __str__(self):
         """Return (p1, p2, p3) with this triangle's points."""
         return f'({self.p1}, {self.p2}, {self.p3})'
     
+    @property
+    def circumcircle(self):
+        """The circle circumscribed in this triangle; it is computed only once."""
+        try:
+            return self._circumcircle
+        except AttributeError:
+            self._circumcircle = Circle.from_triangle(self)
+            return self._circumcircle
+
+    @property
+    def signed_area(self) -> float:
+        """The area, positive if p1, p2, p3 are in counterclockwise order; computed only once."""
+        try:
+            return self._signed_area
+        except AttributeError:
+            self._signed_area = ((self.p2.y - self.p3.y) * (self.p1.x - self.p3.x)
+                                 + (self.p3.x - self.p2.x) * (self.p1.y - self.p3.y)) / 2
+            return self._signed_area
+    
     def strictly_contains(self, p: Point) -> bool:
         """Return False if a point is strictly inside this triangle.
 
@@ -127,20 +170,22 @@ class Triangle:
         """
         d_x, d_y = p.x - self.p3.x, p.y - self.p3.y
         d_x_p3p2, d_y_p2p3 = self.p3.x - self.p2.x, self.p2.y - self.p3.y
-        d = d_y_p2p3 * (self.p1.x - self.p3.x) + d_x_p3p2 * (self.p1.y - self.p3.y)
+        d = 2 * self.signed_area
         s = d_y_p2p3 * d_x + d_x_p3p2 * d_y
         t = (self.p3.y - self.p1.y) * d_x + (self.p1.x - self.p3.x) * d_y
         return s < 0 and t < 0 and s + t > d if d < 0 else s > 0 and t > 0 and s + t < d
     
     def shares_vertex(self, other) -> bool:
         """Return True if this triangle and the other share a vertex."""
-        points = {self.p1, self.p2, self.p3}
+        points = (self.p1, self.p2, self.p3)
         return other.p1 in points or other.p2 in points or other.p3 in points
 
 
 class Line:
     """Represents the general line equation Ax + By + C = 0."""
     
+    __slots__ = ('a', 'b', 'c', 'slope')
+    
     def __init__(self, a: float, b: float, c: float):
         """Create a line with the given parameters."""
         self.a = a
@@ -219,6 +264,8 @@ class Line:
 class Circle:
     """Represents the general circle equation (x - h)^2 + (y - k)^2 = r^2."""
     
+    __slots__ = ('h', 'k', 'r')
+    
     def __init__(self, h: float, k: float, r: float):
         """Create a circle with the given parameters."""
         self.h = h
@@ -249,3 +296,32 @@ class Circle:
     def strictly_contains(self, p: Point) -> bool:
         """Determine if a point is strictly inside this circle."""
         return Point(self.h, self.k).distance_to(p) < self.r
+
+
+def incircle(ax: float, ay: float, bx: float, by: float, cx: float, cy: float,
+             dx: float, dy: float) -> float:
+    """Compute the in-circle determinant of the point d with respect to the triangle abc.
+
+    If abc is oriented counterclockwise, the result is positive if d is strictly inside the circle
+    circumscribed in abc, zero if d is on it, and negative if d is outside of it. Unlike
+    Circle.from_triangle, this needs neither square roots nor divisions.
+    Reference: https://en.wikipedia.org/wiki/Delaunay_triangulation#Algorithms.
+    """
+    adx, ady, bdx, bdy, cdx, cdy = ax - dx, ay - dy, bx - dx, by - dy, cx - dx, cy - dy
+    al, bl, cl = adx * adx + ady * ady, bdx * bdx + bdy * bdy, cdx * cdx + cdy * cdy
+    return adx * (bdy * cl - bl * cdy) - ady * (bdx * cl - bl * cdx) + al * (bdx * cdy - bdy * cdx)
+
+
+def circumcircle(ax: float, ay: float, bx: float, by: float, cx: float,
+                 cy: float) -> Tuple[float, float, float]:
+    """Compute the center (h, k) and the radius r of the circle circumscribed in the triangle abc.
+
+    Same as Circle.from_triangle, but from the coordinates alone, so no objects are created.
+    Raises ZeroDivisionError if the points are collinear.
+    Reference: https://en.wikipedia.org/wiki/Circumscribed_circle#Cartesian_coordinates.
+    """
+    d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    al, bl, cl = ax * ax + ay * ay, bx * bx + by * by, cx * cx + cy * cy
+    h = (al * (by - cy) + bl * (cy - ay) + cl * (ay - by)) / d
+    k = (al * (cx - bx) + bl * (ax - cx) + cl * (bx - ax)) / d
+    return h, k, hypot(h - ax, k - ay)
@@ -1,33 +1,61 @@
 import tkinter as tk
 from tkinter import ttk
 from platform import system
-from math import pi
-from geometry.plane import Point, Triangle, Line, Circle
-from geometry.algorithms import convex_hull, delaunay_triangulation, voronoi_diagram
+from typing import Iterable, Tuple
+from geometry.plane import Point, circumcircle
+from geometry.algorithms import (
+    convex_hull_insert, convex_hull_undo, delaunay_triangulation_indices, ray_endpoints,
+    voronoi_diagram)
 
 
 class Canvas(tk.Canvas):
     """Canvas for adding or removing points on the plane."""
     
     POINT_RADIUS = 2.5
-    """The points are actually circles with this radius."""
+    """The points are actually disks with this radius."""
     
     CURSOR_TEXT_SETTINGS = (
         0, 0, {'text': '0, 0', 'anchor': 'nw', 'tag': 'all', 'font': ('Times New Roman', 18)})
     """Coordinates text font and initial text."""
     
-    POINT_SETTINGS = {'fill': 'black', 'tags': ['point', 'all']}
+    POINT_COLOR = 'black'
     """Change the color of the points."""
     
+    RESIZE_DELAY = 50
+    """Milliseconds without configure events after which the canvas is rescaled."""
+    
     def __init__(self, master=None, *args, **kwargs):
         """Initialize class attributes, bind functions, create control panel window, create text."""
         super().__init__(master, *args, **kwargs)
         self.master = master
         self.pack(fill=tk.BOTH, expand=tk.YES)
-        self.points, self.point_ids = [], []
+        # The points' plane coordinates are kept in two parallel lists, which the algorithms take
+        # directly; Point objects are only created for the algorithms that need them.
+        self.xs, self.ys, self.point_positions = [], [], []
+        # The convex hull is kept up to date as points are added, along with the change made by
+        # each addition so that it can be reverted when the point is removed.
+        self.hull, self.hull_changes = [], []
         self.width, self.height = self.winfo_reqwidth(), self.winfo_reqheight()
+        # Whether the window can be resized, so that adding points doesn't disable it every time.
+        self.resizable = True
+        # All the points are drawn on a single image instead of being individual canvas items. The
+        # image and then the coordinates are created first, and the algorithms' items are lowered
+        # below them, so the stacking order never needs to be fixed after adding a point.
+        self.points_image = tk.PhotoImage(width=self.width, height=self.height)
+        self.create_image(0, 0, image=self.points_image, anchor='nw')
         self.cursor_text = self.create_text(*self.CURSOR_TEXT_SETTINGS)
+        # Position of the latest motion event, ID of the idle callback that will show it, and the
+        # plane coordinates currently shown.
+        self.cursor_position, self.cursor_update, self.cursor_shown = (0, 0), None, (0, 0)
+        # ID of the callback that will rescale the canvas, and the size it will rescale it to.
+        self.resize_update, self.resize_size = None, (self.width, self.height)
+        # IDs of the items drawn by the latest algorithm, by item type and options.
+        self.item_pools = {}
+        # Positions of the points that haven't been drawn yet, and ID of the idle callback that
+        # will draw them.
+        self.pending_points, self.points_update = [], None
         self.bind('<Button-1>', self.add_point)
+        self.bind('<B1-Motion>', self.drag_point)
         self.bind('<Button-2>', self.remove_point)
         self.bind("<Configure>", self.on_resize)
         self.bind('<Motion>', self.update_cursor)
@@ -37,81 +65,210 @@ class Canvas(tk.Canvas):
 
     def set_resizable(self, b: bool):
         """Enable or disable resizing."""
+        self.resizable = b
         self.master.resizable(b, b)
 
     def on_resize(self, event):
-        """Scale points, lines, and/or polygons."""
+        """Scale points, lines, and/or polygons once the window stops changing size.
+        
+        Dragging the window's border generates a stream of configure events, so the canvas is only
+        rescaled once, to the size of the latest one.
+        """
         # Point information is effectively lost if there's been a resizing and an execution.
         if self.panel.algorithm_executed:
             self.panel.disable()
+        if self.resize_update is not None:
+            self.after_cancel(self.resize_update)
+        self.resize_size = event.width, event.height
+        self.resize_update = self.after(self.RESIZE_DELAY, self.resize, event.width, event.height)
+    
+    def finish_resize(self):
+        """Rescale the canvas right away if it's waiting to be rescaled.
+
+        Points must be added with the canvas at its actual size, or their ordinates would be
+        converted with the old height and they'd be drawn on the old-sized image.
+        """
+        if self.resize_update is not None:
+            self.after_cancel(self.resize_update)
+            self.resize(*self.resize_size)
+    
+    def resize(self, width: int, height: int):
+        """Scale points, lines, and/or polygons to the given canvas size."""
+        self.resize_update = None
+        # Configuring the canvas below generates a configure event with the same size.
+        if (width, height) == (self.width, self.height):
+            return
         # Determine the ratio of old width/height to new width/height.
-        wscale = event.width / self.width
-        hscale = event.height / self.height
-        self.width, self.height = event.width, event.height
+        wscale = width / self.width
+        hscale = height / self.height
+        self.width, self.height = width, height
         # Resize the canvas.
         self.config(width=self.width, height=self.height)
         # Rescale all the objects tagged with the "all" tag.
         self.scale("all", 0, 0, wscale, hscale)
+        # The points are pixels of an image, so they are redrawn at their new positions instead.
+        self.point_positions = [(x * wscale, y * hscale) for x, y in self.point_positions]
+        self.points_image.configure(width=self.width, height=self.height)
+        self.redraw_points()
     
     def add_point(self, event):
-        """Draw a point and save the object and its returned ID.
+        """Draw a point and save its plane coordinates and its position on the canvas.
         
         If it's the first point added, this method disables window resizing.
         """
-        self.set_resizable(False)
+        self.finish_resize()
+        if self.resizable:
+            self.set_resizable(False)
         x, y = event.x, event.y
-        canvas_id = self.create_oval(
-            x - self.POINT_RADIUS, y - self.POINT_RADIUS,
-            x + self.POINT_RADIUS, y + self.POINT_RADIUS,
-            self.POINT_SETTINGS)
-        self.points.append(Point(x, self.convert_ordinate(y)))
-        self.point_ids.append(canvas_id)
-        self.tag_raise(self.cursor_text)
+        # Dragging adds points faster than they need to be drawn, so they're drawn together once
+        # the event queue is idle.
+        self.pending_points.append((x, y))
+        if self.points_update is None:
+            self.points_update = self.after_idle(self.draw_pending_points)
+        self.xs.append(x)
+        self.ys.append(self.convert_ordinate(y))
+        self.point_positions.append((x, y))
+        self.hull_changes.append(
+            convex_hull_insert(self.hull, self.xs, self.ys, len(self.xs) - 1))
+    
+    def drag_point(self, event):
+        """Add a point wherever the cursor is dragged, and keep showing its coordinates.
+
+        The canvas keeps getting these events while the cursor is dragged outside of it; those
+        positions are ignored, so every ordinate stays between 0 and the canvas height. So are the
+        positions closer to the last point than a point's diameter plus one pixel, so that dragged
+        points don't overlap and a slightly shaky click adds a single point.
+        """
+        self.finish_resize()
+        if not 0 <= event.x < self.width or not 0 <= event.y < self.height:
+            return
+        self.update_cursor(event)
+        spacing = 2 * self.POINT_RADIUS + 1
+        if self.point_positions:
+            x, y = self.point_positions[-1]
+            if (event.x - x)**2 + (event.y - y)**2 < spacing**2:
+                return
+        self.add_point(event)
     
     def remove_point(self, _event):
         """Delete a point from the canvas and its saved information.
         
         If there are no more points, enable window resizing again.
         """
-        if self.points:
-            self.delete(self.point_ids[-1])
-            del self.points[-1]
-            del self.point_ids[-1]
-        if not self.points:
+        if self.xs:
+            del self.xs[-1]
+            del self.ys[-1]
+            del self.point_positions[-1]
+            convex_hull_undo(self.hull, self.hull_changes.pop())
+            # A point that hasn't been drawn yet is simply forgotten; otherwise, other points may
+            # overlap the removed one, so all of them are redrawn.
+            if self.pending_points:
+                del self.pending_points[-1]
+            else:
+                self.redraw_points()
+        if not self.xs:
             self.set_resizable(True)
             self.panel.algorithm_executed = False  # Permit executions.
             
     def update_cursor(self, event):
-        """Update the coordinates shown at the top left part of the canvas."""
-        self.itemconfigure(self.cursor_text, text=f'{event.x}, {self.convert_ordinate(event.y)}')
+        """Update the coordinates shown at the top left part of the canvas.
+        
+        Motion events can arrive much faster than the canvas is redrawn, so the text is only
+        changed once the event queue is idle, with the position of the latest event.
+        """
+        self.cursor_position = event.x, event.y
+        if self.cursor_update is None:
+            self.cursor_update = self.after_idle(self.show_cursor)
+    
+    def show_cursor(self):
+        """Show the coordinates of the latest motion event, unless they're already shown."""
+        self.cursor_update = None
+        x, y = self.cursor_position
+        coordinates = x, self.convert_ordinate(y)
+        if coordinates != self.cursor_shown:
+            self.cursor_shown = coordinates
+            self.itemconfigure(self.cursor_text, text=f'{x}, {coordinates[1]}')
     
     def clear(self):
         """Delete everything on the canvas except the coordinates, and enable resizing."""
         self.set_resizable(True)
         self.delete('current_algorithm')
-        self.delete('point')
-        self.points, self.point_ids = [], []
+        self.item_pools = {}
+        self.points_image.blank()
+        self.xs, self.ys, self.point_positions = [], [], []
+        self.hull, self.hull_changes = [], []
+        self.pending_points = []
+    
+    def point_rectangles(self, x: float, y: float) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """Return the two pixel rectangles that form the disk centered at a canvas position.
+
+        The rectangles overlap (a square without its corners); the image clips them on the right
+        and bottom, but the coordinates can't be negative.
+        """
+        x, y, r = round(x), round(y), int(self.POINT_RADIUS)
+        return ((max(x - r, 0), max(y - r + 1, 0), x + r + 1, y + r),
+                (max(x - r + 1, 0), max(y - r, 0), x + r, y + r + 1))
+
+    def draw_points(self, positions: Iterable[Tuple[float, float]], blank: bool = False):
+        """Draw disks centered at the given canvas positions with a single Tcl script.
+
+        If blank is True, the points' image is cleared first.
+        """
+        image, color = self.points_image, self.POINT_COLOR
+        self.tk.eval('\n'.join(([f'{image} blank'] if blank else []) + [
+            f'{image} put {color} -to {x1} {y1} {x2} {y2}' for x, y in positions
+            for x1, y1, x2, y2 in self.point_rectangles(x, y)]))
+
+    def draw_pending_points(self):
+        """Draw the points added since the last time this method was called."""
+        self.points_update = None
+        self.draw_points(self.pending_points)
+        self.pending_points = []
+
+    def redraw_points(self):
+        """Clear the points' image and draw every point again, including the pending ones."""
+        self.draw_points(self.point_positions, blank=True)
+        self.pending_points = []
     
     def convert_ordinate(self, y: int) -> int:
         """Convert a window ordinate to a Euclidean plane ordinate and viceversa."""
-        return self.master.winfo_height() - y
+        # The canvas fills the window, and on_resize keeps its height up to date, so there's no
+        # need to query the window manager on every conversion.
+        return self.height - y
 
-    def create_line(self, p1: Point, p2: Point, *args, **kwargs) -> int:
-        """Create a line more easily given two point objects."""
-        return super().create_line(int(p1.x), int(self.convert_ordinate(p1.y)),
-                                   int(p2.x), int(self.convert_ordinate(p2.y)), *args, **kwargs)
+    def draw_items(self, layers: Iterable[Tuple[str, Iterable, dict]]):
+        """Draw several layers of canvas items, reusing the items drawn by the previous call.
 
-    def create_triangle(self, triangle: Triangle, *args, **kwargs) -> int:
-        """Create a triangle more easily given a triangle object."""
-        p1, p2, p3 = triangle.p1, triangle.p2, triangle.p3
-        return self.create_polygon(
-            *[(int(p.x), int(self.convert_ordinate(p.y))) for p in [p1, p2, p3]], *args, **kwargs)
-    
-    def create_circle(self, circle: Circle, *args, **kwargs) -> int:
-        """Create a circle more easily given a circle object."""
-        h, k, r = int(circle.h), int(circle.k), int(circle.r)
-        return self.create_oval(int(h - r), int(self.convert_ordinate(k + r)),
-                                int(h + r), int(self.convert_ordinate(k - r)), *args, **kwargs)
+        Each layer holds an item type, the flat coordinates of each item, as would be given to the
+        corresponding create_ method, e.g. (x1, y1, x2, y2, x3, y3) for a triangle, or already
+        formatted as a string, e.g. 'x1 y1 x2 y2 x3 y3', and the items' options. Every option value
+        must be a string or a list of strings without spaces, braces, or backslashes. Items with
+        the same type and options as in the previous call are moved instead of created again, and
+        the ones left over are deleted. Each layer takes a single call to the Tcl interpreter.
+        """
+        pools = {}
+        for item_type, coordinates, settings in layers:
+            options = ' '.join(
+                f'-{option} {{{" ".join(value) if isinstance(value, list) else value}}}'
+                for option, value in settings.items())
+            pool = self.item_pools.pop((item_type, options), [])
+            coordinates = [item if isinstance(item, str) else ' '.join(map(str, item))
+                           for item in coordinates]
+            script = [f'{self} delete {" ".join(map(str, pool[len(coordinates):]))}']
+            script += [f'{self} coords {item} {coords}' for item, coords in zip(pool, coordinates)]
+            created = coordinates[len(pool):]
+            if created:
+                # Every create command is the same around the coordinates, so a single join puts
+                # all of them together.
+                command = f'{self} create {item_type} '
+                script.append(command + f' {options}\n{command}'.join(created) + f' {options}')
+            last_item = self.tk.eval('\n'.join(script))
+            # The canvas numbers its items consecutively, so the script returns the last new ID.
+            pools[item_type, options] = pool[:len(coordinates)] + list(
+                range(int(last_item) - len(created) + 1, int(last_item) + 1) if created else [])
+        for pool in self.item_pools.values():
+            self.delete(*pool)
+        self.item_pools = pools
     
 
 class ControlPanel(tk.Toplevel):
@@ -143,18 +300,22 @@ class ControlPanel(tk.Toplevel):
         'outline': '#FF0000', 'tags': ['circle', 'current_algorithm', 'all']}
     """Circle outlines and fills."""
     
+    VORONOI_SETTINGS = {'tags': ['current_algorithm', 'all']}
+    """Voronoi segments and rays."""
+    
     def __init__(self, master=None, *args, **kwargs):
         """Create combobox and buttons."""
         super().__init__(master, *args, **kwargs)
         self.canvas = master
         self.algorithm_executed = False
+        # The latest Voronoi diagram and the coordinates it was computed for.
+        self.voronoi_points, self.voronoi = None, None
         self.wm_title('Control panel')
         self.protocol('WM_DELETE_WINDOW', lambda: self.canvas.master.destroy())
-        label = tk.Label(self, text=self.LABEL_TEXT, justify=tk.LEFT)
-        label.pack(side=tk.TOP, expand=tk.YES)
-        self.algorithm_combobox = ttk.Combobox(self, values=self.ALGORITHM_NAMES)
+        tk.Label(self, text=self.LABEL_TEXT, justify=tk.LEFT).pack(side=tk.TOP, expand=tk.YES)
+        self.algorithm_combobox = ttk.Combobox(
+            self, values=self.ALGORITHM_NAMES, state='readonly', width='30')
         self.algorithm_combobox.bind("<<ComboboxSelected>>", self.execute_algorithm)
-        self.algorithm_combobox.config(state='readonly', width='30')
         self.algorithm_combobox.current(0)
         self.algorithm_combobox.pack(side=tk.TOP, fill=tk.X)
         self.update_button = tk.Button(
@@ -180,50 +341,50 @@ class ControlPanel(tk.Toplevel):
         """Draw the result of executing the currently selected algorithm."""
         # Do nothing or clear previous algorithm.
         option = self.algorithm_combobox.get()
-        if not self.canvas.points or option == self.ALGORITHM_NAMES[0]:
+        if not self.canvas.xs or option == self.ALGORITHM_NAMES[0]:
             return
-        self.canvas.delete('current_algorithm')
+        # The algorithms return indices of points, which are drawn at their canvas positions.
+        xs, ys, positions = self.canvas.xs, self.canvas.ys, self.canvas.point_positions
+        layers = []
         # Convex hull.
         if option == self.ALGORITHM_NAMES[1]:
-            c_hull = convex_hull(self.canvas.points)
-            self.canvas.create_polygon(
-                *[(p.x, self.canvas.convert_ordinate(p.y)) for p in c_hull],
-                self.CONVEX_HULL_SETTINGS)
+            hull = ' '.join(f'{x} {y}' for x, y in (positions[i] for i in self.canvas.hull))
+            layers.append(('polygon', [hull], self.CONVEX_HULL_SETTINGS))
         # Delaunay triangulation with or without circumcircles.
         elif option == self.ALGORITHM_NAMES[2] or option == self.ALGORITHM_NAMES[3]:
-            triangles, circles = delaunay_triangulation(self.canvas.points), []
-            for triangle in triangles:
-                self.canvas.create_triangle(triangle, self.TRIANGLE_SETTINGS)
-                circles.append(Circle.from_triangle(triangle))
-            for circle in circles:
-                self.canvas.create_circle(circle, self.CIRCLE_SETTINGS)
-            if option == self.ALGORITHM_NAMES[2]:
-                self.canvas.delete('circle')
+            triangles = delaunay_triangulation_indices(xs, ys)
+            # A point is a vertex of about six triangles, so its integer position is formatted only
+            # once.
+            vertices = [f'{int(x)} {int(y)}' for x, y in positions]
+            layers.append((
+                'polygon', [f'{vertices[i]} {vertices[j]} {vertices[k]}' for i, j, k in triangles],
+                self.TRIANGLE_SETTINGS))
+            if option == self.ALGORITHM_NAMES[3]:
+                # The circles are computed straight from the coordinates, without any objects.
+                height, circles = self.canvas.height, []
+                for a, b, c in triangles:
+                    h, k, r = map(int, circumcircle(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]))
+                    circles.append(f'{h - r} {height - k - r} {h + r} {height - k + r}')
+                layers.append(('oval', circles, self.CIRCLE_SETTINGS))
         # Voronoi diagram.
         elif option == self.ALGORITHM_NAMES[4]:
-            voronoi = voronoi_diagram(self.canvas.points)
-            segments, rays = voronoi[0], voronoi[1]
-            for segment in segments:
-                p1, p2 = segment.p1, segment.p2
-                self.canvas.create_line(p1, p2, tags=['current_algorithm', 'all'])
-            # Line equations for the canvas's borders.
-            top_line, bottom_line = Line(0, 1, -self.canvas.winfo_height()), Line(0, 1, 0)
-            left_line, right_line = Line(1, 0, 0), Line(1, 0, -self.canvas.winfo_width())
-            # Get the ray's line equation and draw a line from the ray's point to the first border
-            # it intersects, depending on the direction the ray's pointing toward.
-            for ray in rays:
-                p, angle, ray_line = ray.p, ray.angle, Line.from_ray(ray)
-                intersection1 = ray_line.intersection(top_line if 0 <= angle < pi else bottom_line)
-                intersection2 = ray_line.intersection(
-                    left_line if pi / 2 <= angle < 3 * pi / 2 else right_line)
-                if intersection1 and intersection2:
-                    endpoint = (
-                        intersection1
-                        if p.distance_to(intersection1) < p.distance_to(intersection2)
-                        else intersection2)
-                else:
-                    endpoint = intersection1 or intersection2
-                self.canvas.create_line(p, endpoint, tags=['current_algorithm', 'all'])
+            # Updating without having changed the points doesn't compute the diagram again.
+            points = tuple(xs), tuple(ys)
+            if points != self.voronoi_points:
+                self.voronoi_points = points
+                self.voronoi = voronoi_diagram([Point(x, y) for x, y in zip(xs, ys)])
+            segments, rays = self.voronoi
+            width, height = self.canvas.width, self.canvas.height
+            lines = [f'{int(segment.p1.x)} {int(height - segment.p1.y)} '
+                     f'{int(segment.p2.x)} {int(height - segment.p2.y)}' for segment in segments]
+            # Draw a line from each ray's point to the first border it reaches.
+            lines += [f'{int(ray.p.x)} {int(height - ray.p.y)} {int(x)} {int(height - y)}'
+                      for ray, (x, y) in zip(rays, ray_endpoints(rays, width, height))]
+            layers.append(('line', lines, self.VORONOI_SETTINGS))
+        # The items of the previous execution are reused, so new triangles could end up above old
+        # circles; the circles are raised before everything is lowered below the points.
+        self.canvas.draw_items(layers)
+        self.canvas.tag_raise('circle')
         self.canvas.tag_lower('current_algorithm')
         self.canvas.set_resizable(True)
         self.algorithm_executed = True
@@ -0,0 +1,186 @@
+import unittest
+from random import Random
+from typing import List, Tuple
+from geometry.algorithms import (
+    akl_toussaint_indices, convex_hull_indices, convex_hull_insert, convex_hull_monotone_indices,
+    convex_hull_undo, delaunay_triangulation_indices)
+
+
+def cross(xs: List[float], ys: List[float], a: int, b: int, c: int) -> float:
+    """Return twice the signed area of the triangle abc, positive if it's counterclockwise."""
+    return (xs[b] - xs[a]) * (ys[c] - ys[a]) - (ys[b] - ys[a]) * (xs[c] - xs[a])
+
+
+def brute_force_hull(xs: List[float], ys: List[float]) -> List[Tuple[float, float]]:
+    """Return the vertices of the convex hull, clockwise from the lowest leftmost one.
+
+    A directed edge ab is on the hull if every point is on its right, or on the segment ab itself,
+    and collinear vertices are left out.
+    """
+    points = sorted(set(zip(xs, ys)))
+    if len(points) <= 2:
+        return points
+    pxs, pys = [p[0] for p in points], [p[1] for p in points]
+    following = {}
+    for a in range(len(points)):
+        for b in range(len(points)):
+            if a != b and all(
+                    cross(pxs, pys, a, b, c) < 0 or cross(pxs, pys, a, b, c) == 0
+                    and min(points[a], points[b]) <= points[c] <= max(points[a], points[b])
+                    for c in range(len(points))):
+                following[a] = b
+    if not following:  # All the points are on a line.
+        return [points[0], points[-1]]
+    hull, i = [0], following[0]
+    while i != 0:
+        hull.append(i)
+        i = following[i]
+    return [points[i] for i in hull]
+
+
+def hull_points(xs: List[float], ys: List[float], hull: List[int]) -> List[Tuple[float, float]]:
+    """Return the points of a hull, starting at the lowest leftmost one."""
+    points = [(xs[i], ys[i]) for i in hull]
+    first = points.index(min(points))
+    return points[first:] + points[:first]
+
+
+def random_points(random: Random, n: int, side: int) -> Tuple[List[int], List[int]]:
+    """Return n random points with integer coordinates in [0, side], possibly repeated."""
+    return [random.randint(0, side) for _ in range(n)], [random.randint(0, side) for _ in range(n)]
+
+
+def grid(n: int, spacing: float) -> Tuple[List[float], List[float]]:
+    """Return the points of an n x n grid with the given spacing."""
+    return ([i * spacing for i in range(n) for _ in range(n)],
+            [j * spacing for _ in range(n) for j in range(n)])
+
+
+class TestConvexHull(unittest.TestCase):
+    """Compare the convex hull functions with a brute-force hull."""
+
+    def inputs(self):
+        """Yield random, repeated, collinear, and float grid points."""
+        random = Random(0)
+        for n in (1, 2, 3, 4, 5, 9, 12, 30):
+            for side in (3, 20, 1000):
+                yield random_points(random, n, side)
+        for n in (1, 4, 8, 9, 12):
+            yield [5] * n, [5] * n
+            yield list(range(n)), [2 * x + 1 for x in range(n)]
+            yield [3] * n, list(range(n))
+        yield grid(6, 0.3)
+        yield grid(6, 0.7)
+
+    def test_convex_hull_indices(self):
+        for xs, ys in self.inputs():
+            hull = hull_points(xs, ys, convex_hull_indices(xs, ys))
+            expected = brute_force_hull(xs, ys)
+            if len(xs) <= 3:
+                self.assertEqual(sorted(hull), sorted(zip(xs, ys)))
+            else:
+                # Collinear points may show up on the hull, but never change its vertices' order.
+                self.assertEqual([p for p in hull if p in expected], expected)
+
+    def test_convex_hull_monotone_indices(self):
+        for xs, ys in self.inputs():
+            hull = convex_hull_monotone_indices(xs, ys)
+            if len(set(zip(xs, ys))) == 1:
+                self.assertEqual(len(set(hull_points(xs, ys, hull))), 1)
+            else:
+                self.assertEqual(hull_points(xs, ys, hull), brute_force_hull(xs, ys))
+
+    def test_akl_toussaint_indices(self):
+        for xs, ys in self.inputs():
+            candidates = akl_toussaint_indices(xs, ys)
+            self.assertEqual(candidates, sorted(set(candidates)))
+            points = {(xs[i], ys[i]) for i in candidates}
+            self.assertTrue(set(brute_force_hull(xs, ys)) <= points)
+
+    def test_convex_hull_insert_and_undo(self):
+        random = Random(1)
+        for sequence in range(300):
+            side = random.choice((3, 8, 100))
+            xs, ys, hull, changes, hulls = [], [], [], [], []
+            for _ in range(random.randint(1, 30)):
+                if xs and random.random() < 0.3:
+                    convex_hull_undo(hull, changes.pop())
+                    del xs[-1], ys[-1]
+                    self.assertEqual(hull, hulls.pop())
+                    continue
+                if sequence % 5 == 0:  # Collinear points.
+                    x = random.randint(0, side)
+                    xs.append(x)
+                    ys.append(2 * x)
+                elif xs and random.random() < 0.2:  # A repeated point.
+                    i = random.randrange(len(xs))
+                    xs.append(xs[i])
+                    ys.append(ys[i])
+                else:
+                    xs.append(random.randint(0, side))
+                    ys.append(random.randint(0, side))
+                hulls.append(hull[:])
+                changes.append(convex_hull_insert(hull, xs, ys, len(xs) - 1))
+                if len(hull) >= 3:
+                    self.assertEqual(hull_points(xs, ys, hull), brute_force_hull(xs, ys))
+
+
+class TestDelaunayTriangulation(unittest.TestCase):
+    """Check the triangulations against the empty circumcircle property and the hull's area."""
+
+    def check(self, xs: List[float], ys: List[float], triangles: List[Tuple[int, int, int]],
+              tolerance: float = 0):
+        """Assert that the triangles are Delaunay and cover exactly the convex hull."""
+        unique = list({point: i for i, point in enumerate(zip(xs, ys))}.values())
+        for a, b, c in triangles:
+            self.assertGreater(cross(xs, ys, a, b, c), 0)
+            # The in-circle determinant, relative to every point.
+            for d in unique:
+                if d in (a, b, c):
+                    continue
+                ax, ay, bx, by = xs[a] - xs[d], ys[a] - ys[d], xs[b] - xs[d], ys[b] - ys[d]
+                cx, cy = xs[c] - xs[d], ys[c] - ys[d]
+                self.assertLessEqual(
+                    (ax * ax + ay * ay) * (bx * cy - by * cx)
+                    - (bx * bx + by * by) * (ax * cy - ay * cx)
+                    + (cx * cx + cy * cy) * (ax * by - ay * bx), tolerance)
+        hull = brute_force_hull(xs, ys)
+        hull_area = abs(sum(
+            x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(hull, hull[1:] + hull[:1])))
+        area = sum(cross(xs, ys, a, b, c) for a, b, c in triangles)
+        self.assertAlmostEqual(area, hull_area, delta=tolerance)
+
+    def test_random_integer_points(self):
+        random = Random(2)
+        for n in (3, 4, 10, 40, 120):
+            for _ in range(5):
+                xs, ys = random_points(random, n, 960)
+                self.check(xs, ys, delaunay_triangulation_indices(xs, ys))
+
+    def test_thin_hull_triangles(self):
+        # Inputs where a super triangle a thousand times the size of the box lost hull triangles.
+        for seed in (12, 28, 210):
+            random = Random(seed)
+            xs = [random.randrange(960) for _ in range(300)]
+            ys = [random.randrange(540) for _ in range(300)]
+            self.check(xs, ys, delaunay_triangulation_indices(xs, ys))
+
+    def test_repeated_points(self):
+        self.assertEqual(delaunay_triangulation_indices([5] * 9, [5] * 9), [])
+        xs, ys = [0, 4, 0, 4, 0, 2], [0, 0, 3, 3, 0, 1]
+        triangles = delaunay_triangulation_indices(xs, ys)
+        used = {i for triangle in triangles for i in triangle}
+        self.assertFalse(0 in used and 4 in used)
+        self.check(xs, ys, triangles)
+
+    def test_float_grids(self):
+        for spacing in (0.3, 0.7):
+            xs, ys = grid(23, spacing)
+            triangles = delaunay_triangulation_indices(xs, ys)
+            # A triangulation of n points with h of them on the hull has 2n - h - 2 triangles.
+            self.assertEqual(len(triangles), 2 * 23 * 23 - 4 * 22 - 2)
+            self.check(xs, ys, triangles, tolerance=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()